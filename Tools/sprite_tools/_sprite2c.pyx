@@ -0,0 +1,40 @@
+# cython: language_level=3, boundscheck=False, wraparound=False
+"""
+_sprite2c.pyx - Optional compiled RGBA -> RGB565 tile converter for sprite2c.py
+
+sprite2c.py uses this when NumPy is not installed. Build it in place with:
+    cythonize -i _sprite2c.pyx
+"""
+
+cdef enum:
+    TRANSPARENT_RGB565 = 0xF81F
+
+
+def convert_tile(const unsigned char[:, :, ::1] pixels, Py_ssize_t x0, Py_ssize_t y0,
+                 Py_ssize_t width, Py_ssize_t height, unsigned short[::1] out,
+                 unsigned int tr, unsigned int tg, unsigned int tb, bint use_key):
+    """Convert the width x height RGBA tile at (x0, y0) into RGB565 values in out.
+
+    Uses the same rounding and transparency rules as sprite2c.py.
+    """
+    if x0 < 0 or y0 < 0 or x0 + width > pixels.shape[1] or y0 + height > pixels.shape[0]:
+        raise ValueError("Tile is outside the image")
+    if out.shape[0] < width * height:
+        raise ValueError("Output buffer is too small for the tile")
+
+    cdef Py_ssize_t x, y, i = 0
+    cdef unsigned int r, g, b, val
+    for y in range(y0, y0 + height):
+        for x in range(x0, x0 + width):
+            r = pixels[y, x, 0]
+            g = pixels[y, x, 1]
+            b = pixels[y, x, 2]
+            if pixels[y, x, 3] < 128 or (use_key and r == tr and g == tg and b == tb):
+                val = TRANSPARENT_RGB565
+            else:
+                val = (((r * 249 + 1014) >> 11) << 11) | (((g * 253 + 505) >> 10) << 5) | ((b * 249 + 1014) >> 11)
+                # Avoid accidental transparency
+                if val == TRANSPARENT_RGB565:
+                    val = 0xF81E
+            out[i] = <unsigned short>val
+            i += 1
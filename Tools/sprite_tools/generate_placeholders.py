@@ -3,12 +3,39 @@
 
 Each sprite is a colored version of the original monochrome design,
 upscaled from 16x16 to 24x24 with 2 animation frames (slight bounce).
+
+The output starts with a "// hash: ..." line of this script's contents;
+if SpriteData.h already carries the same hash, generation is skipped.
+Pass --force to regenerate anyway.
 """
 
+import argparse
+import hashlib
 import math
+import os
+import sys
+
+try:
+    import numpy as np
+except ImportError:
+    print("Error: NumPy is required. Install with: pip install numpy")
+    sys.exit(1)
 
 T = 0xF81F  # Transparent (magenta)
 
+# First line of the generated SpriteData.h, followed by the input hash
+HASH_PREFIX = "// hash: "
+
+class _HexLiterals(dict):
+    """uint16_t value -> C hex literal, formatted the first time it is asked for."""
+
+    def __missing__(self, value):
+        literal = self[value] = f"0x{value:04X}"
+        return literal
+
+# Sprites use a small palette, so after the first few rows formatting is a dict lookup
+HEX_LITERALS = _HexLiterals()
+
 def rgb565(r, g, b):
     """Convert 8-bit RGB to RGB565, avoiding transparent color."""
     val = ((r >> 3) << 11) | ((g >> 2) << 5) | (b >> 3)
@@ -38,185 +65,210 @@ CYAN     = rgb565(80, 220, 220)
 BROWN    = rgb565(160, 100, 40)
 LBROWN   = rgb565(200, 140, 80)
 TEAL     = rgb565(50, 180, 160)
+SICKLY   = rgb565(180, 220, 150)
+DSICKLY  = rgb565(100, 150, 80)
+
+def feature_offsets(pairs):
+    """Split (dy, dx) offsets from a face center into row and column index arrays."""
+    rows, cols = zip(*pairs)
+    return np.array(rows), np.array(cols)
+
+# Facial feature pixels relative to the face center (cx, cy)
+EYES           = feature_offsets([(dy, dx) for dy in (-2, -1) for dx in (-4, -3, 3, 4)])
+EYE_HIGHLIGHTS = feature_offsets([(-2, -4), (-2, 3)])
+SMILE          = feature_offsets([(2, dx) for dx in range(-2, 3)] + [(1, -3), (1, 3)])
+FROWN          = feature_offsets([(3, dx) for dx in range(-2, 3)] + [(4, -3), (4, 3)])
+MOUTH_OPEN     = feature_offsets([(dy, dx) for dy in range(2, 5) for dx in range(-2, 3)])
+MOUTH_INNER    = feature_offsets([(3, dx) for dx in range(-1, 2)])
+X_EYES         = feature_offsets([(i - 2, dx) for i in range(3) for dx in (i - 5, -3 - i, i + 2, 4 - i)])
+CLOSED_EYES    = feature_offsets([(-1, dx) for dx in (-5, -4, -3, 2, 3, 4)])
+
+def stamp(grid, cx, cy, offsets, color):
+    """Set all pixels of a feature around (cx, cy) in one fancy-index assignment."""
+    rows, cols = offsets
+    grid[cy + rows, cx + cols] = color
 
 # Eye patterns (2x2 blocks)
 def draw_eyes(grid, cx, cy, color=BLACK, highlight=WHITE):
     """Draw simple 2x2 eyes at left and right positions."""
-    lx, rx = cx - 4, cx + 3
-    ey = cy - 2
-    for dy in range(2):
-        for dx in range(2):
-            grid[ey + dy][lx + dx] = color
-            grid[ey + dy][rx + dx] = color
-    # Highlight
-    grid[ey][lx] = highlight
-    grid[ey][rx] = highlight
+    stamp(grid, cx, cy, EYES, color)
+    stamp(grid, cx, cy, EYE_HIGHLIGHTS, highlight)
 
 def draw_mouth_smile(grid, cx, cy):
     """Draw a small smile."""
-    y = cy + 2
-    for dx in range(-2, 3):
-        grid[y][cx + dx] = BLACK
-    grid[y - 1][cx - 3] = BLACK
-    grid[y - 1][cx + 3] = BLACK
+    stamp(grid, cx, cy, SMILE, BLACK)
 
 def draw_mouth_frown(grid, cx, cy):
     """Draw a small frown."""
-    y = cy + 3
-    for dx in range(-2, 3):
-        grid[y][cx + dx] = BLACK
-    grid[y + 1][cx - 3] = BLACK
-    grid[y + 1][cx + 3] = BLACK
+    stamp(grid, cx, cy, FROWN, BLACK)
 
 def draw_mouth_open(grid, cx, cy):
     """Draw an open mouth (eating/surprised)."""
-    y = cy + 2
-    for dy in range(3):
-        for dx in range(-2, 3):
-            grid[y + dy][cx + dx] = BLACK
-    # Inner mouth
-    for dy in range(1, 2):
-        for dx in range(-1, 2):
-            grid[y + dy][cx + dx] = RED
+    stamp(grid, cx, cy, MOUTH_OPEN, BLACK)
+    stamp(grid, cx, cy, MOUTH_INNER, RED)
 
 def draw_x_eyes(grid, cx, cy):
     """Draw X-shaped eyes (sick)."""
-    lx, rx = cx - 5, cx + 2
-    ey = cy - 2
-    for i in range(3):
-        grid[ey + i][lx + i] = BLACK
-        grid[ey + i][lx + 2 - i] = BLACK
-        grid[ey + i][rx + i] = BLACK
-        grid[ey + i][rx + 2 - i] = BLACK
+    stamp(grid, cx, cy, X_EYES, BLACK)
 
 def draw_closed_eyes(grid, cx, cy):
     """Draw closed eyes (sleeping)."""
-    lx, rx = cx - 5, cx + 2
-    ey = cy - 1
-    for dx in range(3):
-        grid[ey][lx + dx] = BLACK
-        grid[ey][rx + dx] = BLACK
+    stamp(grid, cx, cy, CLOSED_EYES, BLACK)
+
+def span_half_width(radius_x, dy2, limit):
+    """Largest k with (k / radius_x)^2 + dy2 <= limit, or -1 if the row misses."""
+    if dy2 > limit:
+        return -1
+    k = int(radius_x * math.sqrt(limit - dy2))
+    # sqrt may land one pixel off at the boundary; settle on the exact per-pixel test
+    while k >= 0 and (k / radius_x) * (k / radius_x) + dy2 > limit:
+        k -= 1
+    while ((k + 1) / radius_x) * ((k + 1) / radius_x) + dy2 <= limit:
+        k += 1
+    return k
 
 def make_oval(w, h, cx, cy, radius_x, radius_y, body_color, outline_color):
-    """Create an oval shape with outline."""
-    grid = [[T] * w for _ in range(h)]
+    """Create an oval shape with outline as a (h, w) uint16 grid.
+
+    Each row is filled as two horizontal spans (outline, then body) around
+    the integer center cx.
+    """
+    grid = np.full((h, w), T, dtype=np.uint16)
     for y in range(h):
-        for x in range(w):
-            dx = (x - cx) / radius_x
-            dy = (y - cy) / radius_y
-            dist = dx * dx + dy * dy
-            if dist <= 0.85:
-                grid[y][x] = body_color
-            elif dist <= 1.0:
-                grid[y][x] = outline_color
+        dy = (y - cy) / radius_y
+        dy2 = dy * dy
+        outer = span_half_width(radius_x, dy2, 1.0)
+        if outer < 0:
+            continue
+        # Clamp both ends: a negative stop would wrap around to the right edge
+        grid[y, max(cx - outer, 0):max(cx + outer + 1, 0)] = outline_color
+        inner = span_half_width(radius_x, dy2, 0.85)
+        if inner >= 0:
+            grid[y, max(cx - inner, 0):max(cx + inner + 1, 0)] = body_color
     return grid
 
 def flatten(grid):
-    """Flatten 2D grid to 1D array."""
-    return [pixel for row in grid for pixel in row]
+    """Flatten 2D grid to a 1D view of the same pixels."""
+    return grid.ravel()
 
 def shift_down(grid, pixels):
-    """Shift grid contents down by N pixels (for bounce animation)."""
-    h = len(grid)
-    w = len(grid[0])
-    new_grid = [[T] * w for _ in range(h)]
-    for y in range(h - pixels):
-        for x in range(w):
-            new_grid[y + pixels][x] = grid[y][x]
+    """Shift grid contents down by N pixels, or up for negative N (for bounce animation)."""
+    new_grid = np.full_like(grid, T)
+    if pixels >= 0:
+        new_grid[pixels:] = grid[:len(grid) - pixels]
+    else:
+        new_grid[:pixels] = grid[-pixels:]
     return new_grid
 
 # ── Sprite Generators ─────────────────────────────────────────────────────────
+#
+# Each generator draws the parts that never change between frames into a
+# template once. Every frame then starts from its own copy of that template
+# (moved up/down for bounces) and only draws the animated pixels.
 
 def make_egg():
     """Egg: cream oval with cracks."""
+    template = make_oval(24, 24, 12, 12, 8, 10, CREAM, LBROWN)
     frames = []
     for bounce in [0, 1]:
-        g = make_oval(24, 24, 12, 12, 8, 10, CREAM, LBROWN)
+        g = template.copy()
         # Crack pattern
         for x, y in [(10, 5), (11, 6), (12, 5), (13, 6), (14, 5)]:
-            g[y + bounce][x] = BROWN
+            g[y + bounce, x] = BROWN
         # Spots
-        g[10 + bounce][8] = LBROWN
-        g[14 + bounce][15] = LBROWN
+        g[10 + bounce, 8] = LBROWN
+        g[14 + bounce, 15] = LBROWN
         frames.append(flatten(g))
     return frames
 
 def make_baby():
     """Baby: small pink blob with big eyes."""
+    template = make_oval(24, 24, 12, 13, 7, 7, PINK, DRED)
+    draw_eyes(template, 12, 12, BLACK, WHITE)
+    # Tiny smile
+    template[15, 11] = BLACK
+    template[15, 12] = BLACK
+    template[15, 13] = BLACK
+    # Cheek blush
+    template[14, 7] = LPINK
+    template[14, 16] = LPINK
     frames = []
     for bounce in [0, 1]:
-        g = make_oval(24, 24, 12, 13 - bounce, 7, 7, PINK, DRED)
-        draw_eyes(g, 12, 12 - bounce, BLACK, WHITE)
-        # Tiny smile
-        g[15 - bounce][11] = BLACK
-        g[15 - bounce][12] = BLACK
-        g[15 - bounce][13] = BLACK
-        # Cheek blush
-        g[14 - bounce][7] = LPINK
-        g[14 - bounce][16] = LPINK
+        g = shift_down(template, -bounce)
         frames.append(flatten(g))
     return frames
 
 def make_teen():
     """Teen: blue rounded creature with spiky top."""
+    template = make_oval(24, 24, 12, 13, 8, 8, LBLUE, BLUE)
+    draw_eyes(template, 12, 12, BLACK, WHITE)
+    draw_mouth_smile(template, 12, 12)
+    # Spiky hair
+    for x in [9, 12, 15]:
+        template[4, x] = BLUE
+        template[3, x] = BLUE
     frames = []
     for bounce in [0, 1]:
-        g = make_oval(24, 24, 12, 13 - bounce, 8, 8, LBLUE, BLUE)
-        draw_eyes(g, 12, 12 - bounce, BLACK, WHITE)
-        draw_mouth_smile(g, 12, 12 - bounce)
-        # Spiky hair
-        for x in [9, 12, 15]:
-            g[4 - bounce][x] = BLUE
-            g[3 - bounce][x] = BLUE
+        g = shift_down(template, -bounce)
         frames.append(flatten(g))
     return frames
 
 def make_adult():
     """Adult: larger green creature with distinct features."""
+    template = make_oval(24, 24, 12, 12, 9, 9, GREEN, TEAL)
+    draw_eyes(template, 12, 11, BLACK, WHITE)
+    draw_mouth_smile(template, 12, 11)
+    # Ears/horns
+    template[2, 7] = TEAL
+    template[2, 16] = TEAL
+    template[3, 7] = GREEN
+    template[3, 16] = GREEN
     frames = []
     for bounce in [0, 1, 0]:
-        g = make_oval(24, 24, 12, 12 - bounce, 9, 9, GREEN, TEAL)
-        draw_eyes(g, 12, 11 - bounce, BLACK, WHITE)
-        draw_mouth_smile(g, 12, 11 - bounce)
-        # Ears/horns
-        g[2 - bounce][7] = TEAL
-        g[2 - bounce][16] = TEAL
-        g[3 - bounce][7] = GREEN
-        g[3 - bounce][16] = GREEN
+        g = shift_down(template, -bounce)
         frames.append(flatten(g))
     return frames
 
 def make_elder():
     """Elder: purple creature with wrinkles."""
+    template = make_oval(24, 24, 12, 12, 9, 9, LPURPLE, PURPLE)
+    draw_eyes(template, 12, 11, BLACK, WHITE)
+    # Wrinkle lines under eyes
+    template[14, 7] = PURPLE
+    template[14, 8] = PURPLE
+    template[14, 15] = PURPLE
+    template[14, 16] = PURPLE
+    # Small smile
+    template[15, 11] = BLACK
+    template[15, 12] = BLACK
+    template[15, 13] = BLACK
     frames = []
     for bounce in [0, 1]:
-        g = make_oval(24, 24, 12, 12 - bounce, 9, 9, LPURPLE, PURPLE)
-        draw_eyes(g, 12, 11 - bounce, BLACK, WHITE)
-        # Wrinkle lines under eyes
-        y = 14 - bounce
-        g[y][7] = PURPLE
-        g[y][8] = PURPLE
-        g[y][15] = PURPLE
-        g[y][16] = PURPLE
-        # Small smile
-        g[15 - bounce][11] = BLACK
-        g[15 - bounce][12] = BLACK
-        g[15 - bounce][13] = BLACK
+        g = shift_down(template, -bounce)
         frames.append(flatten(g))
     return frames
 
 def make_ghost():
     """Ghost: white translucent with wavy bottom."""
+    template = np.full((24, 24), T, dtype=np.uint16)
+    # Ghost body (top half oval, bottom wavy)
+    y, x = np.ogrid[4:18, 4:20]
+    dx = (x - 12) / 8
+    dy = (y - 10) / 8
+    template[4:18, 4:20][dx * dx + dy * dy <= 1.0] = WHITE
+    # Eyes
+    for dy in range(2):
+        for dx in range(2):
+            template[10 + dy, 8 + dx] = BLACK
+            template[10 + dy, 13 + dx] = BLACK
+    # Open mouth
+    template[14, 11] = DGRAY
+    template[14, 12] = DGRAY
+    template[15, 11] = DGRAY
+    template[15, 12] = DGRAY
     frames = []
     for phase in [0, 1, 2]:
-        g = [[T] * 24 for _ in range(24)]
-        # Ghost body (top half oval, bottom wavy)
-        for y in range(4, 18):
-            for x in range(4, 20):
-                dx = (x - 12) / 8
-                dy = (y - 10) / 8
-                if dx * dx + dy * dy <= 1.0:
-                    g[y][x] = WHITE
+        g = template.copy()
         # Wavy bottom
         for x in range(4, 20):
             wave = int(math.sin((x + phase) * 1.2) * 1.5)
@@ -224,157 +276,210 @@ def make_ghost():
             for dy in range(3):
                 yy = base_y + dy + wave
                 if 0 <= yy < 24 and 4 <= x < 20:
-                    g[yy][x] = WHITE if dy < 2 else LGRAY
-        # Eyes
-        for dy in range(2):
-            for dx in range(2):
-                g[10 + dy][8 + dx] = BLACK
-                g[10 + dy][13 + dx] = BLACK
-        # Open mouth
-        g[14][11] = DGRAY
-        g[14][12] = DGRAY
-        g[15][11] = DGRAY
-        g[15][12] = DGRAY
+                    g[yy, x] = WHITE if dy < 2 else LGRAY
         frames.append(flatten(g))
     return frames
 
 def make_sick():
     """Sick: greenish with X eyes and sweat drop."""
+    template = make_oval(24, 24, 12, 12, 9, 9, SICKLY, DSICKLY)
+    draw_x_eyes(template, 12, 12)
+    # Green-tinged mouth (wavy)
+    for dx in range(-2, 3):
+        y = 16 + (1 if dx % 2 == 0 else 0)
+        template[y, 12 + dx] = BLACK
     frames = []
     for bounce in [0, 1]:
-        g = make_oval(24, 24, 12, 12, 9, 9, rgb565(180, 220, 150), rgb565(100, 150, 80))
-        draw_x_eyes(g, 12, 12)
-        # Green-tinged mouth (wavy)
-        for dx in range(-2, 3):
-            y = 16 + (1 if dx % 2 == 0 else 0)
-            g[y][12 + dx] = BLACK
+        g = template.copy()
         # Sweat drop
         if bounce == 0:
-            g[5][18] = LBLUE
-            g[6][18] = BLUE
+            g[5, 18] = LBLUE
+            g[6, 18] = BLUE
         else:
-            g[6][18] = LBLUE
-            g[7][18] = BLUE
+            g[6, 18] = LBLUE
+            g[7, 18] = BLUE
         frames.append(flatten(g))
     return frames
 
 def make_happy():
     """Happy: bright yellow with big smile and sparkles."""
+    template = make_oval(24, 24, 12, 12, 9, 9, YELLOW, ORANGE)
+    draw_eyes(template, 12, 11, BLACK, WHITE)
+    draw_mouth_smile(template, 12, 11)
+    # Blush
+    template[14, 6] = ORANGE
+    template[14, 17] = ORANGE
     frames = []
     for bounce in [0, 1]:
-        g = make_oval(24, 24, 12, 12 - bounce, 9, 9, YELLOW, ORANGE)
-        draw_eyes(g, 12, 11 - bounce, BLACK, WHITE)
-        draw_mouth_smile(g, 12, 11 - bounce)
-        # Blush
-        g[14 - bounce][6] = ORANGE
-        g[14 - bounce][17] = ORANGE
+        g = shift_down(template, -bounce)
         # Sparkle
         if bounce == 0:
-            g[3][4] = WHITE
-            g[3][19] = WHITE
+            g[3, 4] = WHITE
+            g[3, 19] = WHITE
         else:
-            g[4][3] = WHITE
-            g[4][20] = WHITE
+            g[4, 3] = WHITE
+            g[4, 20] = WHITE
         frames.append(flatten(g))
     return frames
 
 def make_sad():
     """Sad: dark blue with frown and tear."""
+    template = make_oval(24, 24, 12, 12, 9, 9, LBLUE, BLUE)
+    draw_eyes(template, 12, 11, BLACK, WHITE)
+    draw_mouth_frown(template, 12, 11)
     frames = []
     for bounce in [0, 1]:
-        g = make_oval(24, 24, 12, 12, 9, 9, LBLUE, BLUE)
-        draw_eyes(g, 12, 11, BLACK, WHITE)
-        draw_mouth_frown(g, 12, 11)
+        g = template.copy()
         # Tear
         ty = 14 + bounce
-        g[ty][7] = CYAN
-        g[ty + 1][7] = BLUE
+        g[ty, 7] = CYAN
+        g[ty + 1, 7] = BLUE
         frames.append(flatten(g))
     return frames
 
 def make_eating():
     """Eating: orange-tinted with open mouth, food particle."""
+    template = make_oval(24, 24, 12, 12, 9, 9, ORANGE, BROWN)
+    draw_eyes(template, 12, 11, BLACK, WHITE)
     frames = []
     for phase in [0, 1, 2]:
-        g = make_oval(24, 24, 12, 12, 9, 9, ORANGE, BROWN)
-        draw_eyes(g, 12, 11, BLACK, WHITE)
+        g = template.copy()
         if phase == 1:
             # Mouth closed (chewing)
-            g[15][11] = BLACK
-            g[15][12] = BLACK
-            g[15][13] = BLACK
+            g[15, 11] = BLACK
+            g[15, 12] = BLACK
+            g[15, 13] = BLACK
         else:
             draw_mouth_open(g, 12, 11)
         # Food particle
         if phase == 0:
-            g[10][4] = GREEN
-            g[11][4] = GREEN
-            g[10][5] = GREEN
+            g[10, 4] = GREEN
+            g[11, 4] = GREEN
+            g[10, 5] = GREEN
         frames.append(flatten(g))
     return frames
 
 def make_playing():
     """Playing: bouncing with star eyes."""
+    template = make_oval(24, 24, 12, 12, 9, 8, CYAN, TEAL)
+    # Star-shaped eyes
+    draw_eyes(template, 12, 11, BLACK, YELLOW)
+    # Big grin
+    y = 14
+    for dx in range(-3, 4):
+        template[y, 12 + dx] = BLACK
+    template[y - 1, 12 - 4] = BLACK
+    template[y - 1, 12 + 4] = BLACK
     frames = []
     for phase in [0, 1, 2]:
         offset = [0, -2, -1][phase]
-        g = make_oval(24, 24, 12, 12 - offset, 9, 8, CYAN, TEAL)
-        # Star-shaped eyes
-        draw_eyes(g, 12, 11 - offset, BLACK, YELLOW)
-        # Big grin
-        y = 14 - offset
-        for dx in range(-3, 4):
-            g[y][12 + dx] = BLACK
-        g[y - 1][12 - 4] = BLACK
-        g[y - 1][12 + 4] = BLACK
+        g = shift_down(template, -offset)
         # Motion lines
         if phase == 1:
-            g[6][3] = LGRAY
-            g[7][2] = LGRAY
-            g[6][20] = LGRAY
-            g[7][21] = LGRAY
+            g[6, 3] = LGRAY
+            g[7, 2] = LGRAY
+            g[6, 20] = LGRAY
+            g[7, 21] = LGRAY
         frames.append(flatten(g))
     return frames
 
 def make_sleeping():
     """Sleeping: curled up with closed eyes and Z's."""
+    template = make_oval(24, 24, 12, 14, 9, 8, LPURPLE, PURPLE)
+    draw_closed_eyes(template, 12, 13)
+    # Slight smile
+    template[16, 11] = BLACK
+    template[16, 12] = BLACK
+    template[16, 13] = BLACK
+    # Smaller Z
+    template[3, 16] = LGRAY
     frames = []
     for phase in [0, 1]:
-        g = make_oval(24, 24, 12, 14, 9, 8, LPURPLE, PURPLE)
-        draw_closed_eyes(g, 12, 13)
-        # Slight smile
-        g[16][11] = BLACK
-        g[16][12] = BLACK
-        g[16][13] = BLACK
+        g = template.copy()
         # Z's floating
         zx = 18 + phase
         zy = 5 - phase
         if 0 <= zx < 24 and 0 <= zy < 24:
-            g[zy][zx] = WHITE
+            g[zy, zx] = WHITE
             if zx + 1 < 24:
-                g[zy][zx + 1] = WHITE
+                g[zy, zx + 1] = WHITE
         if 0 <= zy + 1 < 24:
-            g[zy + 1][zx] = WHITE
-        # Smaller Z
-        sz_x = 16
-        sz_y = 3
-        if 0 <= sz_y < 24 and 0 <= sz_x < 24:
-            g[sz_y][sz_x] = LGRAY
+            g[zy + 1, zx] = WHITE
         frames.append(flatten(g))
     return frames
 
-
 def format_array(name, idx, data):
-    """Format pixel data as C array."""
-    lines = [f"constexpr uint16_t sprite_{name}_frame{idx}[{len(data)}] = {{"]
-    for row_start in range(0, len(data), 24):
-        row = data[row_start:row_start + 24]
-        lines.append("    " + ", ".join(f"0x{v:04X}" for v in row) + ",")
-    lines.append("};")
-    return "\n".join(lines)
+    """Format pixel data as C array, yielding one line at a time."""
+    yield f"constexpr uint16_t sprite_{name}_frame{idx}[{len(data)}] = {{\n"
+    values = data.tolist()
+    for row_start in range(0, len(values), 24):
+        yield "    " + ", ".join(map(HEX_LITERALS.__getitem__, values[row_start:row_start + 24])) + ",\n"
+    yield "};\n"
+
+
+def read_header_hash(path):
+    """Return the input hash recorded on the first line of SpriteData.h, if any."""
+    try:
+        with open(path, "r") as f:
+            first_line = f.readline()
+    except OSError:
+        return None
+    if not first_line.startswith(HASH_PREFIX):
+        return None
+    return first_line[len(HASH_PREFIX):].strip()
+
+
+def write_spritedata(out, sprites):
+    """Write the SpriteData.h body (everything after the hash line) to out."""
+    out.write("/**\n")
+    out.write(" * @file SpriteData.h\n")
+    out.write(" * @brief Placeholder 24x24 RGB565 sprite data for TamaTac\n")
+    out.write(" *\n")
+    out.write(" * Auto-generated by generate_placeholders.py\n")
+    out.write(" * Replace with real pixel art via sprite2c.py\n")
+    out.write(" */\n")
+    out.write("#pragma once\n")
+    out.write("\n")
+    out.write('#include "Sprites.h"\n')
+    out.write("\n")
+
+    # Frame data arrays
+    for name, frames, delay, loop in sprites:
+        for i, frame in enumerate(frames):
+            out.writelines(format_array(name, i, frame))
+            out.write("\n")
+
+    # AnimFrame arrays
+    for name, frames, delay, loop in sprites:
+        frame_refs = ", ".join(f"{{sprite_{name}_frame{i}}}" for i in range(len(frames)))
+        out.write(f"constexpr AnimFrame frames_{name}[] = {{ {frame_refs} }};\n")
+    out.write("\n")
+
+    # AnimatedSprites table
+    out.write("const AnimatedSprite animatedSprites[PET_SPRITE_COUNT] = {\n")
+    for name, frames, delay, loop in sprites:
+        loop_str = "true" if loop else "false"
+        out.write(f"    {{frames_{name}, {len(frames)}, {delay}, {loop_str}}},\n")
+    out.write("};\n")
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Generate placeholder TamaTac SpriteData.h")
+    parser.add_argument("--force", "-f", action="store_true",
+                        help="Regenerate even if this script is unchanged since the last run")
+    args = parser.parse_args()
+
+    output_path = os.path.join(os.path.dirname(__file__), "..", "..",
+                               "Apps", "TamaTac", "main", "Source", "SpriteData.h")
+    output_path = os.path.normpath(output_path)
+
+    # Palette and generators all live in this file, so its contents are the inputs
+    with open(__file__, "rb") as f:
+        input_hash = hashlib.sha1(f.read()).hexdigest()
+    if not args.force and read_header_hash(output_path) == input_hash:
+        print(f"{output_path} is up to date (use --force to regenerate)")
+        return
+
     sprites = [
         ("egg_idle",   make_egg(),     800, True),
         ("baby_idle",  make_baby(),    600, True),
@@ -390,47 +495,19 @@ def main():
         ("sleeping",   make_sleeping(),1000, True),
     ]
 
-    lines = []
-    lines.append("/**")
-    lines.append(" * @file SpriteData.h")
-    lines.append(" * @brief Placeholder 24x24 RGB565 sprite data for TamaTac")
-    lines.append(" *")
-    lines.append(" * Auto-generated by generate_placeholders.py")
-    lines.append(" * Replace with real pixel art via sprite2c.py")
-    lines.append(" */")
-    lines.append("#pragma once")
-    lines.append("")
-    lines.append('#include "Sprites.h"')
-    lines.append("")
-
-    # Frame data arrays
-    for name, frames, delay, loop in sprites:
-        for i, frame in enumerate(frames):
-            lines.append(format_array(name, i, frame))
-            lines.append("")
-
-    # AnimFrame arrays
-    for name, frames, delay, loop in sprites:
-        frame_refs = ", ".join(f"{{sprite_{name}_frame{i}}}" for i in range(len(frames)))
-        lines.append(f"constexpr AnimFrame frames_{name}[] = {{ {frame_refs} }};")
-    lines.append("")
-
-    # AnimatedSprites table
-    lines.append("const AnimatedSprite animatedSprites[PET_SPRITE_COUNT] = {")
-    for name, frames, delay, loop in sprites:
-        loop_str = "true" if loop else "false"
-        lines.append(f"    {{frames_{name}, {len(frames)}, {delay}, {loop_str}}},")
-    lines.append("};")
-
-    output = "\n".join(lines) + "\n"
+    # Write to SpriteData.h via a temp file, so an interrupted run never leaves a
+    # truncated header that already carries the current hash
+    tmp_path = f"{output_path}.tmp"
+    try:
+        with open(tmp_path, "w") as out:
+            out.write(f"{HASH_PREFIX}{input_hash}\n")
+            write_spritedata(out, sprites)
+        os.replace(tmp_path, output_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
 
-    # Write to SpriteData.h
-    import os
-    output_path = os.path.join(os.path.dirname(__file__), "..", "..",
-                               "Apps", "TamaTac", "main", "Source", "SpriteData.h")
-    output_path = os.path.normpath(output_path)
-    with open(output_path, "w") as f:
-        f.write(output)
     print(f"Generated {output_path}")
     print(f"  {len(sprites)} sprites, {sum(len(f) for _, f, _, _ in sprites)} total frames")
 
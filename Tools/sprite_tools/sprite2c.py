@@ -45,11 +45,33 @@ SpriteData mode (--spritedata):
         eating,300,false
         playing,300,false
         ...
+
+    The output starts with a "// hash: ..." line covering the PNGs, the
+    config file, the frame settings and this script. If an existing output
+    has the same hash, generation is skipped (use --force to regenerate).
+
+Dependencies:
+    Pillow is required. Pixel conversion uses NumPy when it is installed.
+    Without NumPy, the optional _sprite2c extension is used if it has been
+    built (cythonize -i _sprite2c.pyx), otherwise a slower pure-Python loop.
 """
 
 import argparse
+import hashlib
 import os
 import sys
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    import _sprite2c
+except ImportError:
+    _sprite2c = None
 
 try:
     from PIL import Image
@@ -60,6 +82,21 @@ except ImportError:
 
 TRANSPARENT_RGB565 = 0xF81F  # Magenta in RGB565
 
+# First line of a generated SpriteData.h, followed by the input hash
+HASH_PREFIX = "// hash: "
+
+
+class _HexLiterals(dict):
+    """uint16_t value -> C hex literal, formatted the first time it is asked for."""
+
+    def __missing__(self, value):
+        literal = self[value] = f"0x{value:04X}"
+        return literal
+
+
+# Sprites use a small palette, so after the first few rows formatting is a dict lookup
+HEX_LITERALS = _HexLiterals()
+
 # SpriteId enum order (must match Sprites.h)
 SPRITE_NAMES = [
     "egg_idle", "baby_idle", "teen_idle", "adult_idle", "elder_idle",
@@ -84,8 +121,50 @@ DEFAULT_ANIM_CONFIG = {
 
 
 def rgb_to_rgb565(r, g, b):
-    """Convert 8-bit RGB to RGB565."""
-    return ((r >> 3) << 11) | ((g >> 2) << 5) | (b >> 3)
+    """Convert 8-bit RGB to RGB565, rounding each channel to the nearest level.
+
+    (c * 249 + 1014) >> 11 and (c * 253 + 505) >> 10 are exact integer forms of
+    round(c * 31 / 255) and round(c * 63 / 255), so 0 and 255 map to the end
+    points and 565 -> 888 -> 565 round-trips losslessly.
+    """
+    return (((r * 249 + 1014) >> 11) << 11) | (((g * 253 + 505) >> 10) << 5) | ((b * 249 + 1014) >> 11)
+
+
+def rgb_to_rgb565_arr(rgb):
+    """Convert an (..., 3+) uint8 RGB(A) array to a uint16 RGB565 array.
+
+    Uses the same rounding as rgb_to_rgb565. Values that collide with the
+    transparent color key are nudged to 0xF81E.
+    """
+    r = rgb[..., 0].astype(np.uint32)
+    g = rgb[..., 1].astype(np.uint32)
+    b = rgb[..., 2].astype(np.uint32)
+    val = (((r * 249 + 1014) >> 11) << 11) | (((g * 253 + 505) >> 10) << 5) | ((b * 249 + 1014) >> 11)
+    val = val.astype(np.uint16)
+    # Avoid accidental transparency
+    val[val == TRANSPARENT_RGB565] = 0xF81E  # Slightly different magenta
+    return val
+
+
+def rgba_array(image):
+    """Return a PIL Image's pixels as an (H, W, 4) uint8 RGBA array.
+
+    RGBA images are not converted again, and the decoded bytes are wrapped
+    without a further copy (the result is read-only). Without NumPy this is
+    a memoryview of the same shape.
+    """
+    if image.mode != "RGBA":
+        image = image.convert("RGBA")
+    shape = (image.height, image.width, 4)
+    if np is None:
+        return memoryview(image.tobytes()).cast("B", shape)
+    return np.frombuffer(image.tobytes(), dtype=np.uint8).reshape(shape)
+
+
+def load_rgba(path):
+    """Decode an image file into an (H, W, 4) uint8 RGBA array."""
+    with Image.open(path) as img:
+        return rgba_array(img)
 
 
 def convert_sprite(image, frame_width, frame_height, transparent_color=None, cols=None):
@@ -99,10 +178,18 @@ def convert_sprite(image, frame_width, frame_height, transparent_color=None, col
         cols: Number of columns to extract (auto-detected if None)
 
     Returns:
-        List of lists of uint16_t values (one list per frame)
+        List of uint16 frame buffers, one per frame (NumPy arrays, or
+        array('H') when NumPy is not installed)
     """
-    img = image.convert("RGBA")
-    img_width, img_height = img.size
+    return convert_pixels(rgba_array(image), frame_width, frame_height, transparent_color, cols)
+
+
+def convert_pixels(pixels, frame_width, frame_height, transparent_color=None, cols=None):
+    """Convert an (H, W, 4) uint8 RGBA array to a list of RGB565 frame arrays.
+
+    See convert_sprite for the meaning of the remaining arguments.
+    """
+    img_height, img_width = pixels.shape[:2]
 
     max_cols = img_width // frame_width
     cols = cols if cols is not None else max_cols
@@ -112,72 +199,125 @@ def convert_sprite(image, frame_width, frame_height, transparent_color=None, col
         print(f"Error: Image {img_width}x{img_height} is smaller than frame size {frame_width}x{frame_height}")
         sys.exit(1)
 
+    if cols > max_cols:
+        print(f"Error: --cols {cols} needs an image at least {cols * frame_width}px wide, got {img_width}px")
+        sys.exit(1)
+
+    if np is None:
+        return convert_frames_fallback(pixels, frame_width, frame_height, rows, cols, transparent_color)
+
+    # Convert and mask the whole used area in one pass, then slice frames out
+    pixels = pixels[:rows * frame_height, :cols * frame_width]
+    val = rgb_to_rgb565_arr(pixels)
+
+    mask = pixels[..., 3] < 128
+    if transparent_color is not None:
+        mask |= (pixels[..., :3] == transparent_color).all(axis=-1)
+    val[mask] = TRANSPARENT_RGB565
+
+    frames = []
+    for row in range(rows):
+        for col in range(cols):
+            tile = val[row * frame_height:(row + 1) * frame_height,
+                       col * frame_width:(col + 1) * frame_width]
+            frames.append(tile.ravel())
+
+    return frames
+
+
+def convert_frames_fallback(pixels, frame_width, frame_height, rows, cols, transparent_color=None):
+    """Convert frames without NumPy, using the _sprite2c extension if it is built."""
+    use_key = transparent_color is not None
+    tr, tg, tb = transparent_color if use_key else (0, 0, 0)
+    data = pixels.tobytes()
+    stride = pixels.shape[1] * 4
+
     frames = []
     for row in range(rows):
         for col in range(cols):
-            frame = []
-            for y in range(frame_height):
-                for x in range(frame_width):
-                    px = img.getpixel((col * frame_width + x, row * frame_height + y))
-                    r, g, b, a = px
-
-                    if transparent_color and (r, g, b) == transparent_color:
-                        frame.append(TRANSPARENT_RGB565)
-                    elif a < 128:
-                        frame.append(TRANSPARENT_RGB565)
-                    else:
-                        val = rgb_to_rgb565(r, g, b)
-                        # Avoid accidental transparency
-                        if val == TRANSPARENT_RGB565:
-                            val = 0xF81E  # Slightly different magenta
-                        frame.append(val)
+            frame = array("H", bytes(2 * frame_width * frame_height))
+            x0, y0 = col * frame_width, row * frame_height
+            if _sprite2c is not None:
+                _sprite2c.convert_tile(pixels, x0, y0, frame_width, frame_height, frame, tr, tg, tb, use_key)
+            else:
+                i = 0
+                for y in range(y0, y0 + frame_height):
+                    start = y * stride + x0 * 4
+                    line = data[start:start + frame_width * 4]
+                    for x in range(0, len(line), 4):
+                        r, g, b, a = line[x:x + 4]
+                        if a < 128 or (use_key and r == tr and g == tg and b == tb):
+                            val = TRANSPARENT_RGB565
+                        else:
+                            val = rgb_to_rgb565(r, g, b)
+                            # Avoid accidental transparency
+                            if val == TRANSPARENT_RGB565:
+                                val = 0xF81E  # Slightly different magenta
+                        frame[i] = val
+                        i += 1
             frames.append(frame)
 
     return frames
 
 
 def format_array(name, frame_idx, data, width):
-    """Format a single frame as a C constexpr array."""
-    lines = []
-    lines.append(f"constexpr uint16_t sprite_{name}_frame{frame_idx}[{len(data)}] = {{")
-
-    for row_start in range(0, len(data), width):
-        row = data[row_start:row_start + width]
-        hex_vals = ", ".join(f"0x{v:04X}" for v in row)
-        lines.append(f"    {hex_vals},")
-
-    lines.append("};")
-    return "\n".join(lines)
-
-
-def generate_header(name, frames, width, height):
-    """Generate complete .h file content for a sprite."""
-    lines = []
-    lines.append(f"// Auto-generated by sprite2c.py - {name}")
-    lines.append(f"// {len(frames)} frame(s), {width}x{height} RGB565")
-    lines.append(f"// Transparent color key: 0x{TRANSPARENT_RGB565:04X} (magenta)")
-    lines.append("")
-    lines.append("#pragma once")
-    lines.append("#include <cstdint>")
-    lines.append("")
+    """Format a single frame as a C constexpr array, yielding one line at a time."""
+    yield f"constexpr uint16_t sprite_{name}_frame{frame_idx}[{len(data)}] = {{\n"
+
+    values = data.tolist()
+    for row_start in range(0, len(values), width):
+        hex_vals = ", ".join(map(HEX_LITERALS.__getitem__, values[row_start:row_start + width]))
+        yield f"    {hex_vals},\n"
+
+    yield "};\n"
+
+
+def generate_header(out, name, frames, width, height):
+    """Write complete .h file content for a sprite to the file object out."""
+    out.write(f"// Auto-generated by sprite2c.py - {name}\n")
+    out.write(f"// {len(frames)} frame(s), {width}x{height} RGB565\n")
+    out.write(f"// Transparent color key: 0x{TRANSPARENT_RGB565:04X} (magenta)\n")
+    out.write("\n")
+    out.write("#pragma once\n")
+    out.write("#include <cstdint>\n")
+    out.write("\n")
 
     for i, frame in enumerate(frames):
-        lines.append(format_array(name, i, frame, width))
-        lines.append("")
+        if i > 0:
+            out.write("\n")
+        out.writelines(format_array(name, i, frame, width))
 
-    return "\n".join(lines)
 
+def list_sprite_files(sprite_dir):
+    """Map lowercased file name -> actual file name for every file in sprite_dir.
+
+    One scandir replaces a stat per sprite. Lookups are case-insensitive like the
+    filesystems on Windows and macOS, so Egg_Idle.PNG still matches egg_idle.png,
+    but an exact (lowercase) name always wins over other spellings of it.
+    """
+    with os.scandir(sprite_dir) as entries:
+        names = [entry.name for entry in entries if entry.is_file()]
+    files = {}
+    # Exact names first, then the rest in a fixed order, independent of scandir order
+    for name in sorted(names, key=lambda n: (n != n.lower(), n)):
+        files.setdefault(name.lower(), name)
+    return files
 
-def load_anim_config(sprite_dir):
+
+def load_anim_config(sprite_dir, files=None):
     """Load animation config from sprite_config.txt if it exists.
 
+    The file is found through files (see list_sprite_files), scanned here if
+    not given, so it is the same file spritedata_hash covers.
+
     Format: name,delayMs,loop (one per line)
     Returns dict of { name: (delayMs, loop) }
     """
+    if files is None:
+        files = list_sprite_files(sprite_dir)
     config = dict(DEFAULT_ANIM_CONFIG)
-    config_path = os.path.join(sprite_dir, "sprite_config.txt")
-    if os.path.isfile(config_path):
-        with open(config_path, "r") as f:
+    if "sprite_config.txt" in files:
+        with open(os.path.join(sprite_dir, files["sprite_config.txt"]), "r") as f:
             for line in f:
                 line = line.strip()
                 if not line or line.startswith("#"):
@@ -196,49 +336,84 @@ def load_anim_config(sprite_dir):
     return config
 
 
-def generate_spritedata(sprite_dir, frame_width, frame_height, transparent_color):
-    """Generate complete SpriteData.h from a directory of sprite PNGs.
-
-    Expects PNGs named to match SPRITE_NAMES entries.
+def spritedata_hash(sprite_dir, frame_width, frame_height, transparent_color, files=None):
+    """Hash everything that determines the --spritedata output."""
+    if files is None:
+        files = list_sprite_files(sprite_dir)
+    digest = hashlib.sha1()
+    with open(__file__, "rb") as f:
+        digest.update(f.read())
+    digest.update(f"{frame_width}x{frame_height} {transparent_color}".encode())
+    for file_name in [f"{name}.png" for name in SPRITE_NAMES] + ["sprite_config.txt"]:
+        digest.update(file_name.encode())
+        if file_name in files:
+            with open(os.path.join(sprite_dir, files[file_name]), "rb") as f:
+                digest.update(f.read())
+    return digest.hexdigest()
+
+
+def read_header_hash(path):
+    """Return the input hash recorded on the first line of a generated header, if any."""
+    try:
+        with open(path, "r") as f:
+            first_line = f.readline()
+    except OSError:
+        return None
+    if not first_line.startswith(HASH_PREFIX):
+        return None
+    return first_line[len(HASH_PREFIX):].strip()
+
+
+def generate_spritedata(out, sprite_dir, frame_width, frame_height, transparent_color, files=None):
+    """Write a complete SpriteData.h to the file object out from a directory of sprite PNGs.
+
+    Expects PNGs named to match SPRITE_NAMES entries (case-insensitively). files is
+    the list_sprite_files() result for sprite_dir, scanned here if not given.
     """
-    anim_config = load_anim_config(sprite_dir)
-
-    lines = []
-    lines.append("/**")
-    lines.append(" * @file SpriteData.h")
-    lines.append(f" * @brief {frame_width}x{frame_height} RGB565 sprite data for TamaTac")
-    lines.append(" *")
-    lines.append(" * Auto-generated by sprite2c.py --spritedata")
-    lines.append(" * Re-generate with: python sprite2c.py <sprites_dir> --spritedata -o SpriteData.h")
-    lines.append(" */")
-    lines.append("#pragma once")
-    lines.append("")
-    lines.append('#include "Sprites.h"')
-    lines.append("")
+    if files is None:
+        files = list_sprite_files(sprite_dir)
+    anim_config = load_anim_config(sprite_dir, files)
+
+    out.write("/**\n")
+    out.write(" * @file SpriteData.h\n")
+    out.write(f" * @brief {frame_width}x{frame_height} RGB565 sprite data for TamaTac\n")
+    out.write(" *\n")
+    out.write(" * Auto-generated by sprite2c.py --spritedata\n")
+    out.write(" * Re-generate with: python sprite2c.py <sprites_dir> --spritedata -o SpriteData.h\n")
+    out.write(" */\n")
+    out.write("#pragma once\n")
+    out.write("\n")
+    out.write('#include "Sprites.h"\n')
+    out.write("\n")
 
     # Track frames per sprite for the animation table
     sprite_frame_counts = {}
     total_frames = 0
 
     # Process each sprite
+    present = []
     for sprite_name in SPRITE_NAMES:
-        png_path = os.path.join(sprite_dir, f"{sprite_name}.png")
-        if not os.path.isfile(png_path):
+        if f"{sprite_name}.png" not in files:
             print(f"  WARNING: {sprite_name}.png not found, skipping")
             sprite_frame_counts[sprite_name] = 0
             continue
+        present.append(sprite_name)
 
-        with Image.open(png_path) as img:
-            frames = convert_sprite(img, frame_width, frame_height, transparent_color)
-        sprite_frame_counts[sprite_name] = len(frames)
-        total_frames += len(frames)
+    # Decode PNGs on worker threads (Pillow releases the GIL while decoding)
+    # so the next file is decoded while the current one is being formatted.
+    png_paths = [os.path.join(sprite_dir, files[f"{sprite_name}.png"]) for sprite_name in present]
+    with ThreadPoolExecutor() as executor:
+        for sprite_name, pixels in zip(present, executor.map(load_rgba, png_paths)):
+            frames = convert_pixels(pixels, frame_width, frame_height, transparent_color)
+            sprite_frame_counts[sprite_name] = len(frames)
+            total_frames += len(frames)
 
-        print(f"  {sprite_name}: {len(frames)} frame(s) from {sprite_name}.png")
+            print(f"  {sprite_name}: {len(frames)} frame(s) from {files[sprite_name + '.png']}")
 
-        # Write pixel arrays
-        for i, frame in enumerate(frames):
-            lines.append(format_array(sprite_name, i, frame, frame_width))
-            lines.append("")
+            # Write pixel arrays
+            for i, frame in enumerate(frames):
+                out.writelines(format_array(sprite_name, i, frame, frame_width))
+                out.write("\n")
 
     # Write AnimFrame arrays
     for sprite_name in SPRITE_NAMES:
@@ -248,36 +423,34 @@ def generate_spritedata(sprite_dir, frame_width, frame_height, transparent_color
         frame_refs = ", ".join(
             f"{{sprite_{sprite_name}_frame{i}}}" for i in range(count)
         )
-        lines.append(f"constexpr AnimFrame frames_{sprite_name}[] = {{ {frame_refs} }};")
+        out.write(f"constexpr AnimFrame frames_{sprite_name}[] = {{ {frame_refs} }};\n")
 
-    lines.append("")
+    out.write("\n")
 
     # Write animatedSprites table
-    lines.append("const AnimatedSprite animatedSprites[PET_SPRITE_COUNT] = {")
+    out.write("const AnimatedSprite animatedSprites[PET_SPRITE_COUNT] = {\n")
     for sprite_name in SPRITE_NAMES:
         count = sprite_frame_counts.get(sprite_name, 0)
         if count == 0:
             # Fallback: empty entry (shouldn't happen with complete assets)
-            lines.append(f"    {{nullptr, 0, 0, false}},  // {sprite_name} MISSING")
+            out.write(f"    {{nullptr, 0, 0, false}},  // {sprite_name} MISSING\n")
             continue
         delay, loop = anim_config.get(sprite_name, (500, True))
         loop_str = "true" if loop else "false"
-        lines.append(f"    {{frames_{sprite_name}, {count}, {delay}, {loop_str}}},")
+        out.write(f"    {{frames_{sprite_name}, {count}, {delay}, {loop_str}}},\n")
 
-    lines.append("};")
-    lines.append("")
+    out.write("};\n")
 
     processed_count = sum(1 for c in sprite_frame_counts.values() if c > 0)
     print(f"\nTotal: {processed_count} sprites processed, {total_frames} frames")
-    return "\n".join(lines)
 
 
-def process_file(filepath, name, frame_width, frame_height, transparent_color, cols=None):
-    """Process a single PNG file and return header content."""
-    with Image.open(filepath) as img:
-        frames = convert_sprite(img, frame_width, frame_height, transparent_color, cols)
+def process_file(filepath, output_path, name, frame_width, frame_height, transparent_color, cols=None):
+    """Process a single PNG file and write its header to output_path."""
+    frames = convert_pixels(load_rgba(filepath), frame_width, frame_height, transparent_color, cols)
     print(f"  {name}: {len(frames)} frame(s) from {os.path.basename(filepath)}")
-    return generate_header(name, frames, frame_width, frame_height)
+    with open(output_path, "w") as f:
+        generate_header(f, name, frames, frame_width, frame_height)
 
 
 def main():
@@ -292,6 +465,8 @@ def main():
     parser.add_argument("--batch", "-b", action="store_true", help="Process all PNGs in directory")
     parser.add_argument("--spritedata", "-S", action="store_true",
                         help="Generate complete SpriteData.h from directory of sprite PNGs")
+    parser.add_argument("--force", "-f", action="store_true",
+                        help="Regenerate SpriteData.h even if its inputs are unchanged")
 
     args = parser.parse_args()
 
@@ -314,15 +489,30 @@ def main():
             print(f"Error: {args.input} is not a directory")
             sys.exit(1)
 
+        output_path = args.output or "SpriteData.h"
+        files = list_sprite_files(args.input)
+        input_hash = spritedata_hash(args.input, args.width, args.height, transparent_color, files)
+        if not args.force and read_header_hash(output_path) == input_hash:
+            print(f"{output_path} is up to date (use --force to regenerate)")
+            return
+
         print(f"Generating SpriteData.h from {args.input}")
         print(f"Frame size: {args.width}x{args.height}")
         print()
 
-        content = generate_spritedata(args.input, args.width, args.height, transparent_color)
-
-        output_path = args.output or "SpriteData.h"
-        with open(output_path, "w") as f:
-            f.write(content)
+        # Stream into a temp file next to the output and swap it in only once it is
+        # complete, so a failed run leaves the previous SpriteData.h untouched
+        tmp_path = f"{output_path}.tmp"
+        try:
+            with open(tmp_path, "w") as f:
+                f.write(f"{HASH_PREFIX}{input_hash}\n")
+                generate_spritedata(f, args.input, args.width, args.height, transparent_color, files)
+            os.replace(tmp_path, output_path)
+        except BaseException:
+            # Also covers sys.exit() from convert_pixels
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
         print(f"\nOutput: {output_path}")
 
     elif args.batch:
@@ -330,7 +520,8 @@ def main():
             print(f"Error: {args.input} is not a directory")
             sys.exit(1)
 
-        png_files = sorted(f for f in os.listdir(args.input) if f.lower().endswith(".png"))
+        with os.scandir(args.input) as entries:
+            png_files = sorted(e.name for e in entries if e.is_file() and e.name.lower().endswith(".png"))
         if not png_files:
             print(f"No PNG files found in {args.input}")
             sys.exit(1)
@@ -339,11 +530,8 @@ def main():
         for png_file in png_files:
             filepath = os.path.join(args.input, png_file)
             name = os.path.splitext(png_file)[0]
-            content = process_file(filepath, name, args.width, args.height, transparent_color, args.cols)
-
             output_path = os.path.join(args.input, f"{name}.h")
-            with open(output_path, "w") as f:
-                f.write(content)
+            process_file(filepath, output_path, name, args.width, args.height, transparent_color, args.cols)
             print(f"  -> {output_path}")
     else:
         if not os.path.isfile(args.input):
@@ -351,11 +539,8 @@ def main():
             sys.exit(1)
 
         name = args.name or os.path.splitext(os.path.basename(args.input))[0]
-        content = process_file(args.input, name, args.width, args.height, transparent_color, args.cols)
-
         output_path = args.output or f"{name}.h"
-        with open(output_path, "w") as f:
-            f.write(content)
+        process_file(args.input, output_path, name, args.width, args.height, transparent_color, args.cols)
         print(f"Output: {output_path}")
 
 
@@ -19,14 +19,27 @@ Output:
         egg_idle_frame0.png, egg_idle_frame1.png, etc.
 
     Transparent pixels (0xF81F) become fully transparent in the PNG.
+    Images with no transparent pixels are written as plain 8-bit RGB.
     Output is compatible with sprite2c.py --spritedata for round-trip conversion.
 """
 
 import argparse
+import mmap
 import os
 import re
+import struct
 import sys
-from collections import OrderedDict
+import zlib
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
+from itertools import groupby
+from pathlib import Path
+
+try:
+    import numpy as np
+except ImportError:
+    print("Error: NumPy is required. Install with: pip install numpy")
+    sys.exit(1)
 
 try:
     from PIL import Image
@@ -37,9 +50,18 @@ except ImportError:
 
 TRANSPARENT_RGB565 = 0xF81F
 
+# [^}] already spans newlines, so no DOTALL is needed
+_ARRAY_RE = re.compile(
+    rb'constexpr\s+uint16_t\s+(sprite_\w+)\s*\[\d+\]\s*=\s*\{([^}]+)\}\s*;'
+)
+_FRAME_RE = re.compile(r'^sprite_(.+)_frame(\d+)$')
+
+# Only 0x literals count, so comments or other text inside an array body are ignored
+_HEX_RE = re.compile(rb'0x[0-9A-Fa-f]+')
+
 
 def rgb565_to_rgb(val):
-    """Convert RGB565 to 8-bit RGB tuple."""
+    """Convert RGB565 to 8-bit RGB tuple (works element-wise on uint16 arrays too)."""
     r = ((val >> 11) & 0x1F) << 3
     g = ((val >> 5) & 0x3F) << 2
     b = (val & 0x1F) << 3
@@ -50,26 +72,71 @@ def rgb565_to_rgb(val):
     return (r, g, b)
 
 
-def parse_sprite_arrays(header_text):
+def build_rgba_lut():
+    """Build a (65536, 4) uint8 table mapping every RGB565 value to its RGBA color.
+
+    The transparent key maps to (0, 0, 0, 0).
+    """
+    values = np.arange(0x10000, dtype=np.uint16)
+    r, g, b = rgb565_to_rgb(values)
+    lut = np.stack([r, g, b, np.full_like(values, 255)], axis=-1).astype(np.uint8)
+    lut[TRANSPARENT_RGB565] = 0
+    return lut
+
+
+# 256 KB decode table shared by every frame
+RGBA_LUT = build_rgba_lut()
+
+
+def parse_sprite_arrays(header_data):
     """Parse all sprite_*_frame* arrays from SpriteData.h content.
 
+    header_data is any bytes-like buffer (bytes, mmap); only array names are
+    decoded to str.
+
     Returns:
-        OrderedDict of { "sprite_name_frameN": [uint16 values, ...], ... }
+        dict of { "sprite_name_frameN": uint16 ndarray, ... }
     """
-    pattern = re.compile(
-        r'constexpr\s+uint16_t\s+(sprite_\w+)\s*\[\d+\]\s*=\s*\{([^}]+)\}\s*;',
-        re.DOTALL
-    )
+    arrays = {}
+    for match in _ARRAY_RE.finditer(header_data):
+        name = match.group(1).decode("ascii")
+        # One findall per body; int() accepts the 0x prefix
+        tokens = _HEX_RE.findall(match.group(2))
+        # Parse wide and range-check, so a bad literal skips this array instead of
+        # aborting the export (or silently wrapping on older NumPy)
+        try:
+            values = np.fromiter((int(t, 16) for t in tokens), dtype=np.int64)
+        except OverflowError:
+            values = None
+        if values is None or (values.size and values.max() > 0xFFFF):
+            print(f"  SKIP {name}: value out of uint16 range")
+            continue
+        arrays[name] = values.astype(np.uint16)
+
+    return arrays
 
-    arrays = OrderedDict()
-    hex_pattern = re.compile(r'0x([0-9A-Fa-f]+)')
-    for match in pattern.finditer(header_text):
-        name = match.group(1)
-        data_str = match.group(2)
 
-        values = [int(h.group(1), 16) for h in hex_pattern.finditer(data_str)]
-        arrays[name] = values
+def load_sprite_arrays(path):
+    """Parse sprite arrays from a header file, reusing the last parse while it is unmodified.
 
+    The returned dict and arrays are shared between calls and must not be modified.
+    """
+    return _load_arrays(os.path.abspath(path), os.stat(path).st_mtime_ns)
+
+
+@lru_cache(maxsize=8)
+def _load_arrays(path, mtime_ns):
+    """Parse path through a read-only mmap; mtime_ns is only part of the cache key."""
+    with open(path, "rb") as f:
+        # mmap refuses zero-length files
+        if os.fstat(f.fileno()).st_size == 0:
+            return {}
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            arrays = parse_sprite_arrays(data)
+
+    # Cached arrays are shared by every caller
+    for values in arrays.values():
+        values.flags.writeable = False
     return arrays
 
 
@@ -80,70 +147,117 @@ def group_frames(arrays):
     become grouped under "egg_idle" with ordered frame data.
 
     Returns:
-        OrderedDict of { "egg_idle": [ [pixels0], [pixels1], ... ], ... }
+        dict of { "egg_idle": [ [pixels0], [pixels1], ... ], ... } in sprite-name order
     """
-    grouped = OrderedDict()
-    frame_pattern = re.compile(r'^sprite_(.+)_frame(\d+)$')
+    # Keyed by (sprite, frame index) so a repeated index (frame1 / frame01) keeps the later array
+    frames = {
+        (match.group(1), int(match.group(2))): pixels
+        for array_name, pixels in arrays.items()
+        if (match := _FRAME_RE.match(array_name))
+    }
+    # One sort by (sprite, frame index); gaps in the numbering simply drop out
+    entries = sorted(frames.items())
+
+    return {
+        sprite_name: [pixels for _, pixels in group]
+        for sprite_name, group in groupby(entries, key=lambda entry: entry[0][0])
+    }
+
+
+def decode_into(out, pixels):
+    """Decode one frame of RGB565 pixels into out, an (H, W, 4) uint8 array or view."""
+    height, width = out.shape[:2]
+    values = np.asarray(pixels, dtype=np.uint16)
+    if values.size != width * height:
+        raise ValueError(f"frame has {values.size} pixels, expected {width}x{height} = {width * height}")
+    # Every uint16 is a valid LUT index; "clip" lets take() write into out unbuffered
+    np.take(RGBA_LUT, values.reshape(height, width), axis=0, out=out, mode="clip")
+
+
+def render_frame(pixels, width, height, scale=1):
+    """Decode a single frame of RGB565 pixel data into an (H, W, 4) RGBA array."""
+    rgba = np.empty((height, width, 4), dtype=np.uint8)
+    decode_into(rgba, pixels)
 
-    for array_name, pixels in arrays.items():
-        match = frame_pattern.match(array_name)
-        if not match:
-            continue
-        sprite_name = match.group(1)
-        frame_idx = int(match.group(2))
+    if scale > 1:
+        # Integer nearest-neighbour upscale
+        rgba = rgba.repeat(scale, axis=0).repeat(scale, axis=1)
 
-        if sprite_name not in grouped:
-            grouped[sprite_name] = []
+    return rgba
 
-        # Ensure list is large enough
-        while len(grouped[sprite_name]) <= frame_idx:
-            grouped[sprite_name].append(None)
-        grouped[sprite_name][frame_idx] = pixels
 
-    # Remove any None gaps
-    for name in grouped:
-        grouped[name] = [f for f in grouped[name] if f is not None]
+def render_spritesheet(frame_list, width, height, scale=1):
+    """Decode multiple frames side-by-side into one (H, W * N, 4) RGBA array."""
+    num_frames = len(frame_list)
+    sheet_width = width * num_frames
+    sheet = np.empty((height, sheet_width, 4), dtype=np.uint8)
 
-    return grouped
+    for i, pixels in enumerate(frame_list):
+        decode_into(sheet[:, i * width:(i + 1) * width], pixels)
 
+    if scale > 1:
+        sheet = sheet.repeat(scale, axis=0).repeat(scale, axis=1)
 
-def create_frame_png(pixels, width, height, scale=1):
-    """Create a PIL Image from a single frame of RGB565 pixel data."""
-    img = Image.new("RGBA", (width, height))
+    return sheet
 
-    for y in range(height):
-        for x in range(width):
-            idx = y * width + x
-            if idx >= len(pixels):
-                break
-            val = pixels[idx]
 
-            if val == TRANSPARENT_RGB565:
-                img.putpixel((x, y), (0, 0, 0, 0))
-            else:
-                r, g, b = rgb565_to_rgb(val)
-                img.putpixel((x, y), (r, g, b, 255))
+def png_chunk(tag, data):
+    """Build one PNG chunk: length, tag, data, CRC."""
+    return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data))
 
-    if scale > 1:
-        img = img.resize((width * scale, height * scale), Image.NEAREST)
 
-    return img
+def write_png_rgb8(path, rgb, compress_level=1):
+    """Write an (H, W, 3) uint8 array as an 8-bit RGB PNG without going through PIL."""
+    height, width = rgb.shape[:2]
+    # Each scanline is prefixed with filter type 0 (None)
+    raw = np.zeros((height, 1 + width * 3), dtype=np.uint8)
+    raw[:, 1:] = rgb.reshape(height, width * 3)
 
+    with open(path, "wb") as f:
+        f.write(b"\x89PNG\r\n\x1a\n")
+        f.write(png_chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)))
+        f.write(png_chunk(b"IDAT", zlib.compress(raw.tobytes(), compress_level)))
+        f.write(png_chunk(b"IEND", b""))
 
-def create_spritesheet(frame_list, width, height, scale=1):
-    """Create a horizontal spritesheet from multiple frames."""
-    num_frames = len(frame_list)
-    sheet_width = width * num_frames
-    sheet = Image.new("RGBA", (sheet_width, height))
 
-    for i, pixels in enumerate(frame_list):
-        frame_img = create_frame_png(pixels, width, height, scale=1)
-        sheet.paste(frame_img, (i * width, 0))
+def save_png(rgba, path, compress_level=1):
+    """Save an RGBA array, dropping the alpha channel when every pixel is opaque."""
+    if (rgba[..., 3] == 255).all():
+        write_png_rgb8(path, rgba[..., :3], compress_level)
+    else:
+        Image.fromarray(rgba, "RGBA").save(path, format="PNG", compress_level=compress_level, optimize=False)
 
-    if scale > 1:
-        sheet = sheet.resize((sheet_width * scale, height * scale), Image.NEAREST)
 
-    return sheet
+def export_frame(name, pixels, width, height, scale, outdir, compress_level=1):
+    """Export one frame to <outdir>/<name>.png and return its log line."""
+    expected_pixels = width * height
+    if len(pixels) != expected_pixels:
+        return f"SKIP {name}: {len(pixels)} pixels (expected {expected_pixels})"
+
+    rgba = render_frame(pixels, width, height, scale)
+    save_png(rgba, outdir / f"{name}.png", compress_level)
+    return f"{name}.png"
+
+
+def export_spritesheet(sprite_name, frame_list, width, height, scale, outdir, compress_level=1):
+    """Export one sprite's frames to <outdir>/<sprite_name>.png and return its log line."""
+    # Validate all frames
+    valid_frames = [f for f in frame_list if len(f) == width * height]
+    if not valid_frames:
+        return f"SKIP {sprite_name}: no valid frames"
+
+    if len(valid_frames) == 1:
+        # Single frame: just save as-is
+        rgba = render_frame(valid_frames[0], width, height, scale)
+    else:
+        # Multiple frames: create horizontal spritesheet
+        rgba = render_spritesheet(valid_frames, width, height, scale)
+
+    save_png(rgba, outdir / f"{sprite_name}.png", compress_level)
+    frame_desc = f"{len(valid_frames)} frame(s)"
+    if len(valid_frames) > 1:
+        frame_desc += f", {width * len(valid_frames)}x{height}"
+    return f"{sprite_name}.png  ({frame_desc})"
 
 
 def main():
@@ -155,6 +269,8 @@ def main():
     parser.add_argument("--scale", "-s", type=int, default=1, help="Scale factor for output PNGs (default: 1)")
     parser.add_argument("--individual", "-i", action="store_true",
                         help="Export individual frame PNGs instead of spritesheets")
+    parser.add_argument("--compress-level", type=int, default=1, choices=range(10), metavar="0-9",
+                        help="zlib level for output PNGs (default: 1 for fast iteration; use 6+ for release)")
 
     args = parser.parse_args()
 
@@ -162,59 +278,38 @@ def main():
         print(f"Error: {args.input} not found")
         sys.exit(1)
 
-    os.makedirs(args.output, exist_ok=True)
+    outdir = Path(args.output)
+    outdir.mkdir(parents=True, exist_ok=True)
 
-    with open(args.input, "r", encoding="utf-8") as f:
-        content = f.read()
-
-    arrays = parse_sprite_arrays(content)
+    arrays = load_sprite_arrays(args.input)
 
     if not arrays:
         print("No sprite arrays found in input file.")
         sys.exit(1)
 
-    expected_pixels = args.width * args.height
     print(f"Found {len(arrays)} sprite frame(s) in {os.path.basename(args.input)}")
     print(f"Sprite size: {args.width}x{args.height}, output scale: {args.scale}x")
     print()
 
     if args.individual:
         # Export one PNG per frame
-        for name, pixels in arrays.items():
-            if len(pixels) != expected_pixels:
-                print(f"  SKIP {name}: {len(pixels)} pixels (expected {expected_pixels})")
-                continue
-
-            img = create_frame_png(pixels, args.width, args.height, args.scale)
-            output_path = os.path.join(args.output, f"{name}.png")
-            img.save(output_path)
-            print(f"  {name}.png")
+        export, names, frames = export_frame, list(arrays), list(arrays.values())
     else:
         # Export spritesheets (one PNG per sprite, frames side-by-side)
         grouped = group_frames(arrays)
-
-        for sprite_name, frame_list in grouped.items():
-            # Validate all frames
-            valid_frames = [f for f in frame_list if len(f) == expected_pixels]
-            if not valid_frames:
-                print(f"  SKIP {sprite_name}: no valid frames")
-                continue
-
-            if len(valid_frames) == 1:
-                # Single frame: just save as-is
-                img = create_frame_png(valid_frames[0], args.width, args.height, args.scale)
-            else:
-                # Multiple frames: create horizontal spritesheet
-                img = create_spritesheet(valid_frames, args.width, args.height, args.scale)
-
-            output_path = os.path.join(args.output, f"{sprite_name}.png")
-            img.save(output_path)
-            frame_desc = f"{len(valid_frames)} frame(s)"
-            if len(valid_frames) > 1:
-                frame_desc += f", {args.width * len(valid_frames)}x{args.height}"
-            print(f"  {sprite_name}.png  ({frame_desc})")
-
-    print(f"\nExported to {os.path.abspath(args.output)}")
+        export, names, frames = export_spritesheet, list(grouped), list(grouped.values())
+
+    # Sprites are independent; zlib releases the GIL, so threads scale without pickling frames
+    with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+        futures = [
+            executor.submit(export, name, frame_data, args.width, args.height, args.scale,
+                            outdir, args.compress_level)
+            for name, frame_data in zip(names, frames)
+        ]
+        for done, future in enumerate(as_completed(futures), 1):
+            print(f"  [{done}/{len(futures)}] {future.result()}")
+
+    print(f"\nExported to {outdir.resolve()}")
 
 
 if __name__ == "__main__":